@@ -1,11 +1,11 @@
 E621_STATIC_URL = "https://static1.e621.net/data"
 
-POST_COLUMNS = {
+POST_COLUMNS = frozenset({
     'approver_id',    'change_seq',   'comment_count',    'created_at',       'description',
     'down_score',     'duration',     'fav_count',        'file_ext',         'file_size',
     'id',             'image_height', 'image_width',      'is_deleted',       'is_flagged',
     'is_note_locked', 'is_pending',   'is_rating_locked', 'is_status_locked', 'locked_tags',
     'md5',            'parent_id',    'rating',           'score',            'source',
     'tag_string',     'up_score',     'updated_at',       'uploader_id',
-}
-TAG_COLUMNS = {'id', 'name', 'category', 'post_count'}
+})
+TAG_COLUMNS = frozenset({'id', 'name', 'category', 'post_count'})
@@ -1,16 +1,17 @@
 from __future__ import annotations
 
 import re
+import sys
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import date
-from functools import reduce
+from functools import cached_property
 from itertools import chain
 from logging import getLogger
-from operator import iand, ior
+from operator import attrgetter
 from pathlib import Path
 
-from typing import Container, Iterable, Iterator, Literal, Mapping, MutableSequence, Sequence
+from typing import Any, Collection, Container, Iterable, Iterator, Literal, Mapping, MutableSequence, Sequence
 from typing import Generic, TypeVar
 from typing import overload
 from types import EllipsisType as ellipsis
@@ -20,13 +21,42 @@ import polars as pl
 from glutamate.consts import POST_COLUMNS, TAG_COLUMNS
 from glutamate.datamodel import EXT, Post, Rating, TagCategory, DEFAULT_CATEGORIES_ORDER, Tag
 from glutamate.datamodel import ANY_EXT, ANY_RATING, ANY_TAG_CATEGORY
-from glutamate.datamodel import load_post, load_tag
+from glutamate.datamodel import load_posts, load_tag
 
 
 log = getLogger(__name__)
 AnyFrameT = TypeVar("AnyFrameT", bound=pl.DataFrame | pl.LazyFrame)
 E6Posts = TypeVar("E6Posts", covariant=True)
 E6Tags = TypeVar("E6Tags", covariant=True)
+WrapperT = TypeVar("WrapperT", bound="DataframeWrapper")
+
+_CSVDtypes = Mapping[str, pl.DataType | type[pl.DataType]]
+
+_POSTS_ITER_BATCH_SIZE = 8192
+_FORMATTED_TAGS_CACHE_SIZE = 50_000
+_TAGS_TRANSLATIONS = {
+    (remove_underscores, remove_parentheses): str.maketrans(
+        '_' if remove_underscores else '',
+        ' ' if remove_underscores else '',
+        '()' if remove_parentheses else '',
+    )
+    for remove_underscores in (False, True)
+    for remove_parentheses in (False, True)
+}
+_MAX_EXCLUDED_TAGS_ALTERNATION = 1024
+
+_RATING_DTYPE = pl.Enum([rating.value for rating in Rating])
+_FILE_EXT_DTYPE = pl.Categorical
+_POSTS_CSV_DTYPES: _CSVDtypes = {
+    'id': pl.Int64, 'uploader_id': pl.Int64, 'change_seq': pl.Int64, 'file_size': pl.Int64,
+    'score': pl.Int64, 'up_score': pl.Int64, 'down_score': pl.Int64,
+    'fav_count': pl.Int64, 'comment_count': pl.Int64,
+    'image_width': pl.Int64, 'image_height': pl.Int64,
+    'rating': _RATING_DTYPE, 'file_ext': _FILE_EXT_DTYPE,
+}
+_TAGS_CSV_DTYPES: _CSVDtypes = {
+    'id': pl.Int64, 'category': pl.Int64, 'post_count': pl.Int64,
+}
 
 
 class E621(ABC):
@@ -85,7 +115,7 @@ class E621Subset(E621, ABC):
                      tags_to_head: Sequence[str] = (),
                      tags_to_tail: Sequence[str] = (),
                      add_rating_tags: Container[Rating] = (),
-                     exclude_tags: Container[str] = (),
+                     exclude_tags: Collection[str] = (),
                      ) -> dict[str, str]:
         pass
 
@@ -120,24 +150,14 @@ class Query:
                   additional_rating_tags: Rating | Sequence[Rating] | ellipsis = ...,
                   skip_posts: Sequence[int | str] | ellipsis = ...,
                   ) -> Query:
-        include_tags = tuple(self.include_tags) if isinstance(include_tags, ellipsis) else include_tags
-        exclude_tags = tuple(self.include_tags) if isinstance(exclude_tags, ellipsis) else exclude_tags
-        extensions = self.normalized_extensions() if isinstance(extensions, ellipsis) else extensions
-        ratings = self.normalized_ratings() if isinstance(ratings, ellipsis) else ratings
-        min_score = self.min_score if isinstance(min_score, ellipsis) else min_score
-        min_favs = self.min_favs if isinstance(min_favs, ellipsis) else min_favs
-        min_date = self.min_date if isinstance(min_date, ellipsis) else min_date
-        min_area = self.min_area if isinstance(min_area, ellipsis) else min_area
-        min_short_side = self.min_short_side if isinstance(min_short_side, ellipsis) else min_short_side
-        top_n = self.top_n if isinstance(top_n, ellipsis) else top_n
-        additional_rating_tags = self.additional_rating_tags if isinstance(additional_rating_tags, ellipsis) else additional_rating_tags  # noqa: E501
-        skip_posts = self.skip_posts if isinstance(skip_posts, ellipsis) else skip_posts
-        return Query(
-            include_tags=include_tags, exclude_tags=exclude_tags,
-            extensions=extensions, ratings=ratings,
-            min_score=min_score, min_favs=min_favs, min_date=min_date, min_short_side=min_short_side, min_area=min_area,
-            top_n=top_n, additional_rating_tags=additional_rating_tags, skip_posts=skip_posts
-        )
+        changes: dict[str, Any] = {
+            'include_tags': include_tags, 'exclude_tags': exclude_tags,
+            'extensions': extensions, 'ratings': ratings,
+            'min_score': min_score, 'min_favs': min_favs, 'min_date': min_date,
+            'min_short_side': min_short_side, 'min_area': min_area,
+            'top_n': top_n, 'additional_rating_tags': additional_rating_tags, 'skip_posts': skip_posts,
+        }
+        return replace(self, **{field: value for field, value in changes.items() if value is not ...})
 
     def normalized_extensions(self) -> Sequence[EXT]:
         if isinstance(self.extensions, Sequence):
@@ -197,6 +217,38 @@ class DataframeWrapper(ABC, Generic[AnyFrameT]):
     def dataframe(self) -> AnyFrameT:
         return self._dataframe
 
+    @classmethod
+    def _from_validated(cls: type[WrapperT], dataframe: pl.DataFrame | pl.LazyFrame) -> WrapperT:
+        """
+        Wraps frame derived from an already validated one (filtered, sliced, etc.), skipping columns check.
+        """
+        wrapper = cls.__new__(cls)
+        DataframeWrapper.__init__(wrapper, dataframe)
+        return wrapper
+
+    @cached_property
+    def _height(self) -> int:
+        if isinstance(self._dataframe, pl.DataFrame):
+            return self._dataframe.height
+        if '_eager' in self.__dict__:
+            return self._eager.height
+        return self._dataframe.select(pl.len()).collect(engine='streaming').item()
+
+    @cached_property
+    def _eager(self) -> pl.DataFrame:
+        if isinstance(self._dataframe, pl.LazyFrame):
+            return self._dataframe.collect(engine='streaming')
+        return self._dataframe
+
+    def _select_columns(self, *columns: str) -> pl.DataFrame | pl.LazyFrame:
+        """
+        Selects only given columns, so lazy scans read nothing else.
+        Uses the collected frame instead when it is already there.
+        """
+        if '_eager' in self.__dict__:
+            return self._eager.select(columns)
+        return self._dataframe.select(columns)
+
 
 class CSVDataframeMixin(DataframeWrapper[AnyFrameT], ABC):
     def write_parquet(self, parquet_path: Path | str, *, allow_overwrite: bool = False) -> None:
@@ -206,19 +258,17 @@ class CSVDataframeMixin(DataframeWrapper[AnyFrameT], ABC):
 class E621TagsDF(E621Tags, DataframeWrapper[AnyFrameT]):
 
     def __init__(self, dataframe: AnyFrameT) -> None:
-        missing_columns = TAG_COLUMNS.difference(dataframe.columns)
+        missing_columns = TAG_COLUMNS.difference(dataframe.collect_schema().names())
         if missing_columns:
             columns_raw = ', '.join(map(repr, sorted(missing_columns)))
             raise ValueError(f'Tags dataset missing few columns: {columns_raw}')
         super().__init__(dataframe)
 
     def filter_known(self, tags: Iterable[str]) -> set[str]:
-        filters = [pl.col('name') == tag for tag in tags]
-        if filters:
-            filter = _combine_pl_filter_exprs(*filters, method='any')
-            filtered_tags_df = self._dataframe.filter(filter).select('name')
-        else:
-            filtered_tags_df = self._dataframe.select('name')
+        tags = list(tags)
+        filtered_tags_df = self._select_columns('name')
+        if tags:
+            filtered_tags_df = filtered_tags_df.filter(pl.col('name').is_in(pl.Series(tags, dtype=pl.Utf8).implode()))
 
         if isinstance(filtered_tags_df, pl.LazyFrame):
             filtered_tags_df = filtered_tags_df.collect()
@@ -232,31 +282,32 @@ class E621TagsDF(E621Tags, DataframeWrapper[AnyFrameT]):
                      *,
                      ordering: Sequence[TagCategory] = DEFAULT_CATEGORIES_ORDER
                      ) -> MutableSequence[str]:
-        ordered = []
-        tags = set(tags)
-        num_ordering = [cat.value for cat in ordering]
-
-        filters = [pl.col('name') == tag for tag in tags]
-        filter = _combine_pl_filter_exprs(*filters, method='any')
-        tags_df = (
-            self._dataframe
-            .select(['name', 'category'])
-            .filter(filter)
-        )
-        if isinstance(tags_df, pl.LazyFrame):
-            tags_df = tags_df.collect()
+        categories_indexes = {category.value: index for index, category in enumerate(ordering)}
+        categories_tags: list[list[str]] = [[] for _ in ordering]
+        remains: list[str] = []
+        for tag in set(tags):
+            index = categories_indexes.get(self._tags_categories.get(tag, -1))
+            if index is None:
+                remains.append(tag)
+            else:
+                categories_tags[index].append(tag)
 
-        for category_num in num_ordering:
-            category_tags_df = tags_df.filter(pl.col('category') == category_num)
-            category_tags = category_tags_df['name'].to_list()
+        ordered = []
+        for category_tags in categories_tags:
             category_tags.sort()
             ordered.extend(category_tags)
-
-        remains = [tag for tag in tags if tag not in ordered]
+        remains.sort()
         ordered.extend(remains)
 
         return ordered
 
+    @cached_property
+    def _tags_categories(self) -> dict[str, int]:
+        tags_df = self._select_columns('name', 'category')
+        if isinstance(tags_df, pl.LazyFrame):
+            tags_df = tags_df.collect(engine='streaming')
+        return dict(zip(tags_df['name'].to_list(), tags_df['category'].to_list()))
+
     def select(self,
                include: Iterable[str | Tag] = (), *,
                categories: Iterable[TagCategory] = set(ANY_TAG_CATEGORY)
@@ -265,47 +316,36 @@ class E621TagsDF(E621Tags, DataframeWrapper[AnyFrameT]):
             tag.name if isinstance(tag, Tag) else tag
             for tag in include
         )
+        categories = set(categories)
         filters: list[pl.Expr] = []
-        if categories != ANY_TAG_CATEGORY:
-            catefories_filter = (pl.col('category').is_in(set(category.value for category in categories)))
-            filters.append(catefories_filter)
+        if categories != set(ANY_TAG_CATEGORY):
+            categories_values = pl.Series([category.value for category in categories], dtype=pl.Int64).implode()
+            filters.append(pl.col('category').is_in(categories_values))
         if include:
-            filters.append(pl.col('name').is_in(include))
+            filters.append(pl.col('name').is_in(pl.Series(list(include), dtype=pl.Utf8).implode()))
 
         if filters:
             filter = _combine_pl_filter_exprs(*filters, method='all')
             filtered_tags_df = self._dataframe.filter(filter)
         else:
             filtered_tags_df = self._dataframe
-        return E621TagsDF(filtered_tags_df)
+        return E621TagsDF._from_validated(filtered_tags_df)
 
     def with_stats(self, stats_update: Mapping[str, int]) -> E621TagsDF:
-        df = self._dataframe
-
-        names, counts = zip(*stats_update.items())
-        update_df: pl.DataFrame | pl.LazyFrame = pl.DataFrame({'name': names, 'new_count': counts})
-        if isinstance(df, pl.LazyFrame):
-            update_df = update_df.lazy()
-
-        updated_df = df.join(
-            update_df,  # type: ignore
-            left_on=pl.col('name'),
-            right_on=pl.col('name'),
-        ).select(
-            ['id', 'name', 'category', 'new_count']
-        ).rename(
-            {'new_count': 'post_count'}
-        )
+        # tags missing from the update get null count and are dropped, as with an inner join
+        updated_df = self._dataframe.with_columns(
+            pl.col('name').replace_strict(dict(stats_update), default=None, return_dtype=pl.Int64).alias('post_count')
+        ).drop_nulls('post_count')
 
-        return E621TagsDF(updated_df)
+        return E621TagsDF._from_validated(updated_df)
 
     def __contains__(self, value: object) -> bool:
         match value:
-            case Tag(): filter_expr = pl.col('id') == value.id
-            case str(): filter_expr = pl.col('name') == value
+            case Tag(): column, filter_expr = 'id', pl.col('id') == value.id
+            case str(): column, filter_expr = 'name', pl.col('name') == value
             case _: return False
 
-        filtered = self._dataframe.filter(filter_expr)
+        filtered = self._select_columns(column).filter(filter_expr)
         if isinstance(filtered, pl.LazyFrame):
             filtered = filtered.collect()
 
@@ -317,39 +357,32 @@ class E621TagsDF(E621Tags, DataframeWrapper[AnyFrameT]):
     def __getitem__(self, index: slice) -> E621TagsDF: ...
 
     def __getitem__(self, index: int | slice) -> Tag | E621TagsDF:
-        selected = self.dataframe[index]  # TODO: fix LazyFrame case
         if isinstance(index, int):
-            if isinstance(selected, pl.LazyFrame):
-                selected = selected.collect()
-            tags_info_iter = selected.iter_rows(named=True)
-            tags_iter = map(load_tag, tags_info_iter)
-            tag = next(tags_iter)
-            return tag
-        return E621TagsDF(selected)
+            if not -len(self) <= index < len(self):
+                raise IndexError("Tag index out of range")
+            tag_info = self._eager.row(index, named=True)
+            return load_tag(tag_info)
+        return E621TagsDF._from_validated(self._dataframe[index])
 
     def __iter__(self) -> Iterator[Tag]:
-        posts_df: pl.DataFrame | pl.LazyFrame = self._dataframe
-        if isinstance(posts_df, pl.LazyFrame):
-            posts_df = posts_df.collect()
-        posts_iter = posts_df.iter_rows(named=True)
-        return map(load_tag, posts_iter)
+        tags_iter = self._eager.iter_rows(named=True)
+        return map(load_tag, tags_iter)
 
     def __len__(self) -> int:
-        count_df = self._dataframe.select(pl.count())
-        if isinstance(count_df, pl.LazyFrame):
-            count_df = count_df.collect()
-        count = count_df["count"][0]
-        return count
+        return self._height
 
     def __reversed__(self) -> Iterator[Tag]:
         reversed_df = self._dataframe.reverse()
-        reversed_posts = E621TagsDF(reversed_df)
+        reversed_posts: E621TagsDF[Any] = E621TagsDF._from_validated(reversed_df)
         return iter(reversed_posts)
 
 
 class E621TagsCSV(E621TagsDF[pl.LazyFrame], CSVDataframeMixin):
-    def __init__(self, tags_csv: Path) -> None:
-        dataframe = pl.scan_csv(tags_csv)
+    def __init__(self, tags_csv: Path, *, parquet_cache: bool = False) -> None:
+        if parquet_cache:
+            dataframe = _scan_csv_with_parquet_cache(Path(tags_csv), csv_dtypes=_TAGS_CSV_DTYPES)
+        else:
+            dataframe = pl.scan_csv(tags_csv, schema_overrides=_TAGS_CSV_DTYPES, infer_schema_length=0)
         super().__init__(dataframe)
 
 
@@ -357,33 +390,47 @@ class E621PostsDF(E621Posts, DataframeWrapper[AnyFrameT]):
     _dataframe: AnyFrameT
 
     def __init__(self, dataframe: AnyFrameT) -> None:
-        missing_columns = POST_COLUMNS.difference(dataframe.columns)
+        missing_columns = POST_COLUMNS.difference(dataframe.collect_schema().names())
         if missing_columns:
             columns_raw = ', '.join(map(repr, sorted(missing_columns)))
             raise ValueError(f'Posts dataset missing few columns: {columns_raw}')
         super().__init__(dataframe)
 
-    def select(self, query: Query, *, include_deleted: bool = False) -> E621PostsDF:
-        log.info("Filtering posts by query: %s", query)
-        posts_df = self._dataframe.lazy()
+    def materialize(self, *, include_deleted: bool = True) -> E621PostsDF[pl.DataFrame]:
+        """
+        Collects posts into memory once, so following queries don't re-scan the source.
+        Keeps only dump columns and, if asked, drops deleted posts right away.
+        """
+        posts_df = self._dataframe.lazy().select(sorted(POST_COLUMNS)).with_columns(
+            pl.col('rating').cast(_RATING_DTYPE),
+            pl.col('file_ext').cast(_FILE_EXT_DTYPE),
+        )
         if not include_deleted:
             posts_df = posts_df.filter(pl.col('is_deleted') == 'f')
+        collected_df = posts_df.collect(engine='streaming').rechunk()
+        return E621PostsDF._from_validated(collected_df)
 
+    def select(self, query: Query, *, include_deleted: bool = False) -> E621PostsDF:
+        log.info("Filtering posts by query: %s", query)
         filters: list[pl.Expr] = []
-        if query.include_tags:
-            include_tags_filter = self._tags_filter(query.include_tags)
-            filters.append(include_tags_filter)
-        if query.exclude_tags:
-            exclude_tags_filter = self._tags_filter(query.exclude_tags, exclude=True)
-            filters.append(exclude_tags_filter)
+        if not include_deleted:
+            filters.append(pl.col('is_deleted') == 'f')
         if query.extensions != ANY_EXT:
-            extensions = [re.escape(ext.value).replace(r'\*', r'\S*') for ext in query.normalized_extensions()]
-            extensions_filters = (pl.col('file_ext').str.contains(pattern) for pattern in extensions)
+            extensions = [ext.value for ext in query.normalized_extensions()]
+            literal_extensions = [ext for ext in extensions if '*' not in ext]
+            wildcard_extensions = [ext for ext in extensions if '*' in ext]
+            extensions_filters: list[pl.Expr] = []
+            if literal_extensions:
+                literal_extensions_series = pl.Series(literal_extensions, dtype=pl.Utf8)
+                extensions_filters.append(pl.col('file_ext').is_in(literal_extensions_series.implode()))
+            for ext in wildcard_extensions:
+                pattern = re.escape(ext).replace(r'\*', r'\S*')
+                extensions_filters.append(pl.col('file_ext').cast(pl.Utf8).str.contains(pattern))
             extensions_filter = _combine_pl_filter_exprs(*extensions_filters, method='any')
             filters.append(extensions_filter)
         if query.ratings != ANY_RATING:
-            rating_filters = (pl.col('rating') == rating.value for rating in query.normalized_ratings())
-            rating_filter = _combine_pl_filter_exprs(*rating_filters, method='any')
+            ratings = pl.Series([rating.value for rating in query.normalized_ratings()], dtype=pl.Utf8)
+            rating_filter = pl.col('rating').is_in(ratings.implode())
             filters.append(rating_filter)
         if query.min_score > 0:
             score_filter = (pl.col('score') >= query.min_score)
@@ -392,9 +439,7 @@ class E621PostsDF(E621Posts, DataframeWrapper[AnyFrameT]):
             favs_filter = (pl.col('fav_count') >= query.min_favs)
             filters.append(favs_filter)
         if query.min_short_side > 0:
-            short_side_filter = (
-                pl.col('image_width') >= query.min_short_side & pl.col('image_height') >= query.min_short_side
-            )
+            short_side_filter = (pl.min_horizontal('image_width', 'image_height') >= query.min_short_side)
             filters.append(short_side_filter)
         if query.min_area > 0:
             area_filter = (pl.col('image_width') * pl.col('image_height') >= query.min_area)
@@ -403,21 +448,39 @@ class E621PostsDF(E621Posts, DataframeWrapper[AnyFrameT]):
             date_filter = (pl.col('created_at') >= str(query.min_date))
             filters.append(date_filter)
         if query.skip_posts:
-            ids = {e for e in query.skip_posts if isinstance(e, int)}
-            md5s = {e for e in query.skip_posts if isinstance(e, str)}
+            ids: list[int] = []
+            md5s: list[str] = []
+            for post_ref in query.skip_posts:
+                if isinstance(post_ref, int):
+                    ids.append(post_ref)
+                else:
+                    md5s.append(post_ref)
             if ids:
-                skip_posts_id_filter = (~pl.col('id').is_in(ids))
+                skip_posts_id_filter = (~pl.col('id').is_in(pl.Series(ids, dtype=pl.Int64).implode()))
                 filters.append(skip_posts_id_filter)
             if md5s:
-                skip_posts_md5_filter = (~pl.col('md5').is_in(md5s))
+                skip_posts_md5_filter = (~pl.col('md5').is_in(pl.Series(md5s, dtype=pl.Utf8).implode()))
                 filters.append(skip_posts_md5_filter)
 
-        selected_posts_df: pl.DataFrame | pl.LazyFrame
-        if filters:
-            query_filter = _combine_pl_filter_exprs(*filters, method='all')
-            selected_posts_df = posts_df.filter(query_filter)
-        else:
-            selected_posts_df = posts_df
+        substring_filters: list[pl.Expr] = []
+        tags_filters: list[pl.Expr] = []
+        if query.include_tags:
+            substring_filters.extend(self._tags_substring_filters(query.include_tags))
+            include_tags_filter = self._tags_filter(query.include_tags)
+            tags_filters.append(include_tags_filter)
+        if query.exclude_tags:
+            exclude_tags_filter = self._tags_filter(query.exclude_tags, exclude=True)
+            tags_filters.append(exclude_tags_filter)
+
+        if not (filters or substring_filters or tags_filters or query.top_n):
+            return self
+
+        source_df = self._eager if '_eager' in self.__dict__ else self._dataframe
+        selected_posts_df: pl.DataFrame | pl.LazyFrame = source_df.lazy()
+        for stage_filters in (filters, substring_filters, tags_filters):
+            if stage_filters:
+                stage_filter = _combine_pl_filter_exprs(*stage_filters, method='all')
+                selected_posts_df = selected_posts_df.filter(stage_filter)
 
         if query.top_n:
             selected_posts_df = selected_posts_df.top_k(query.top_n, by=pl.col('score'))
@@ -425,37 +488,49 @@ class E621PostsDF(E621Posts, DataframeWrapper[AnyFrameT]):
         # if this E621PostsDF works on DataFrame than resulting E621PostsDF will works on DataFrame
         if isinstance(self._dataframe, pl.DataFrame) and isinstance(selected_posts_df, pl.LazyFrame):
             selected_posts_df = selected_posts_df.collect()
-        selected_posts = E621PostsDF(selected_posts_df)
+        selected_posts: E621PostsDF[Any] = E621PostsDF._from_validated(selected_posts_df)
 
         return selected_posts
 
     def get_tags_stats(self) -> Mapping[str, int]:
         stats_df = (
-            self._dataframe.select(['tag_string'])
-            .with_columns(pl.col('tag_string').str.split(' ').alias('tags'))
-            .select(['tags'])
-            .explode('tags')
-            .rename({'tags': 'name'})
-            .groupby('name').count()
-            .sort(pl.col('name'))
+            self._dataframe
+            .select(pl.col('tag_string').str.split(' ').explode().alias('name'))
+            .group_by('name').len()
         )
         if isinstance(stats_df, pl.LazyFrame):
-            stats_df = stats_df.collect()
+            stats_df = stats_df.collect(engine='streaming')
 
-        stats = {
-            name: count
-            for name, count in zip(stats_df["name"], stats_df["count"])
-        }
+        stats = dict(zip(stats_df['name'].to_list(), stats_df['len'].to_list()))
         return stats
 
-    def _tags_filter(self, tags: Iterable[str], *, exclude: bool = False) -> pl.Expr:
-        tags = (re.escape(word).replace(r'\*', r'\S*') for word in tags)
-        tags_patterns = (r'(^|\s)(' + tag + r')($|\s)' for tag in tags)
-        tags_filters = (pl.col('tag_string').str.contains(pattern) for pattern in tags_patterns)
+    def _tags_substring_filters(self, tags: Iterable[str]) -> list[pl.Expr]:
+        literal_tags = dict.fromkeys(tag for tag in tags if '*' not in tag)
+        return [pl.col('tag_string').str.contains(tag, literal=True) for tag in literal_tags]
 
-        tags_filter: pl.Expr = _combine_pl_filter_exprs(*tags_filters, method='all')
-        if exclude:
-            tags_filter = ~tags_filter
+    def _tags_filter(self, tags: Iterable[str], *, exclude: bool = False) -> pl.Expr:
+        tags = list(tags)
+        literal_tags = {tag for tag in tags if '*' not in tag}
+        wildcard_tags = [re.escape(tag).replace(r'\*', r'\S*') for tag in tags if '*' in tag]
+
+        if exclude and len(literal_tags) <= _MAX_EXCLUDED_TAGS_ALTERNATION:
+            wildcard_tags.extend(map(re.escape, sorted(literal_tags)))
+            literal_tags = set()
+
+        tags_filters: list[pl.Expr] = []
+        if literal_tags:
+            known_tags = pl.Series(list(literal_tags), dtype=pl.Utf8).implode()
+            matched_count = pl.col('tag_string').str.split(' ').list.set_intersection(known_tags).list.len()
+            tags_filters.append(matched_count == (0 if exclude else len(literal_tags)))
+        if wildcard_tags and exclude:
+            tags_pattern = r'(^|\s)(' + '|'.join(wildcard_tags) + r')($|\s)'
+            tags_filters.append(~pl.col('tag_string').str.contains(tags_pattern))
+        elif wildcard_tags:
+            # every pattern must match on its own: one wildcard may match several tags
+            # and delimiters are consumed by the match, so count_matches can't replace these checks
+            tags_patterns = (r'(^|\s)(' + tag + r')($|\s)' for tag in wildcard_tags)
+            tags_filters.extend(pl.col('tag_string').str.contains(pattern) for pattern in tags_patterns)
+        tags_filter = _combine_pl_filter_exprs(*tags_filters, method='all')
 
         return tags_filter
 
@@ -463,7 +538,7 @@ class E621PostsDF(E621Posts, DataframeWrapper[AnyFrameT]):
         if not isinstance(value, Post):
             return False
 
-        filtered = self._dataframe.filter(pl.col('id') == value.id)
+        filtered = self._select_columns('id').filter(pl.col('id') == value.id)
         if isinstance(filtered, pl.LazyFrame):
             filtered = filtered.collect()
 
@@ -475,40 +550,32 @@ class E621PostsDF(E621Posts, DataframeWrapper[AnyFrameT]):
     def __getitem__(self, index: slice) -> Sequence[Post]: ...
 
     def __getitem__(self, index: int | slice) -> Post | Sequence[Post]:
-        selected = self._dataframe[index]  # TODO: fix LazyFrame case
         if isinstance(index, int):
-            if isinstance(selected, pl.LazyFrame):
-                selected = selected.collect()
-            posts_info_iter = selected.iter_rows(named=True)
-            posts_iter = map(load_post, posts_info_iter)
-            post = next(posts_iter)
-            return post
-        return E621PostsDF(selected)
+            if not -len(self) <= index < len(self):
+                raise IndexError("Post index out of range")
+            return next(load_posts(self._eager.slice(index, 1)))
+        return E621PostsDF._from_validated(self._dataframe[index])
 
     def __iter__(self) -> Iterator[Post]:
-        posts_df: pl.DataFrame | pl.LazyFrame = self._dataframe
-        if isinstance(posts_df, pl.LazyFrame):
-            posts_df = posts_df.collect()
-        posts_iter = posts_df.iter_rows(named=True)
-        return map(load_post, posts_iter)
+        for posts_batch in self._eager.iter_slices(_POSTS_ITER_BATCH_SIZE):
+            yield from load_posts(posts_batch)
 
     def __len__(self) -> int:
-        count_df = self._dataframe.select(pl.count())
-        if isinstance(count_df, pl.LazyFrame):
-            count_df = count_df.collect()
-        count = count_df["count"][0]
-        return count
+        return self._height
 
     def __reversed__(self) -> Iterator[Post]:
         reversed_df = self._dataframe.reverse()
-        reversed_posts = E621PostsDF(reversed_df)
+        reversed_posts: E621PostsDF[Any] = E621PostsDF._from_validated(reversed_df)
         return iter(reversed_posts)
 
 
 class E621PostsCSV(E621PostsDF[pl.LazyFrame], CSVDataframeMixin):
 
-    def __init__(self, posts_csv: Path) -> None:
-        dataframe = pl.scan_csv(posts_csv)
+    def __init__(self, posts_csv: Path, *, parquet_cache: bool = False) -> None:
+        if parquet_cache:
+            dataframe = _scan_csv_with_parquet_cache(Path(posts_csv), csv_dtypes=_POSTS_CSV_DTYPES)
+        else:
+            dataframe = pl.scan_csv(posts_csv, schema_overrides=_POSTS_CSV_DTYPES, infer_schema_length=0)
         super().__init__(dataframe)
 
 
@@ -542,8 +609,8 @@ class E621Data(E621):
         if exclude_unknown_tags:
             known_tags = self.tags.filter_known(chain(query.include_tags, query.exclude_tags))
             query = query.copy_with(
-                include_tags=[tag for tag in query.include_tags if tag in known_tags],
-                exclude_tags=[tag for tag in query.exclude_tags if tag in known_tags],
+                include_tags=tuple(tag for tag in query.include_tags if tag in known_tags),
+                exclude_tags=tuple(tag for tag in query.exclude_tags if tag in known_tags),
             )
         posts = self.posts.select(query, include_deleted=include_deleted)
         return posts
@@ -588,42 +655,158 @@ class E621DataSubset(E621Subset, E621Data):
                      tags_to_head: Sequence[str] = (),
                      tags_to_tail: Sequence[str] = (),
                      add_rating_tags: Container[Rating] = (),
-                     exclude_tags: Container[str] = (),
+                     exclude_tags: Collection[str] = (),
                      ):
         if not tags_separator:
             raise ValueError("Tags separator can not be empty string")
+        if isinstance(self.posts, E621PostsDF) and isinstance(self.tags, E621TagsDF):
+            return self._get_dataframe_captions(
+                self.posts, self.tags,
+                naming=naming,
+                remove_underscores=remove_underscores,
+                remove_parentheses=remove_parentheses,
+                tags_separator=tags_separator,
+                tags_ordering=tags_ordering,
+                tags_to_head=tags_to_head,
+                tags_to_tail=tags_to_tail,
+                add_rating_tags=add_rating_tags,
+                exclude_tags=exclude_tags,
+            )
+
         captions: dict[str, str] = {}
-        exclusive_order: set[str] = {*tags_to_head, *tags_to_tail}
-
-        for post in self.posts:
-            key = f"{(post.id if naming == 'id' else post.md5)}"
-            post_tags = {
-                tag for tag in post.tags
-                if not (tag in exclusive_order or tag in exclude_tags)
-            }
-            ordered_tags = self.tags.reorder_tags(post_tags, ordering=tags_ordering)
-            ordered_tags = self._format_tags(ordered_tags, remove_underscores, remove_parentheses)
-            if post.rating in add_rating_tags:
-                ordered_tags.append(post.rating.name.lower())
-            captions[key] = tags_separator.join(chain(tags_to_head, ordered_tags, tags_to_tail))
+        exclusive_order = frozenset(map(sys.intern, chain(tags_to_head, tags_to_tail)))
+        exclude_tags = frozenset(map(sys.intern, exclude_tags))
+
+        posts_tags: list[tuple[str, Rating, frozenset[str]]] = []
+        for key, rating, tags in self._iter_captions_fields(self.posts, naming=naming):
+            posts_tags.append((key, rating, tags - exclusive_order - exclude_tags))
+
+        all_tags = frozenset().union(*(post_tags for _, _, post_tags in posts_tags))
+        global_order = self.tags.reorder_tags(all_tags, ordering=tags_ordering)
+        tags_ranks = {tag: rank for rank, tag in enumerate(global_order)}
+
+        formatted_cache: dict[frozenset[str], tuple[str, ...]] = {}
+        for key, rating, post_tags in posts_tags:
+            formatted_tags = formatted_cache.get(post_tags)
+            if formatted_tags is None:
+                ordered_tags = sorted(post_tags, key=tags_ranks.__getitem__)
+                formatted_tags = tuple(self._format_tags(ordered_tags, remove_underscores, remove_parentheses))
+                if len(formatted_cache) >= _FORMATTED_TAGS_CACHE_SIZE:
+                    formatted_cache.clear()
+                formatted_cache[post_tags] = formatted_tags
+            rating_tags = (rating.name.lower(), ) if rating in add_rating_tags else ()
+            captions[key] = tags_separator.join(chain(tags_to_head, formatted_tags, rating_tags, tags_to_tail))
 
         return captions
 
     def get_autocomplete_info(self):
         pass
 
+    @staticmethod
+    def _iter_captions_fields(posts: E621Posts,
+                              *,
+                              naming: Literal['id', 'md5'],
+                              ) -> Iterator[tuple[str, Rating, frozenset[str]]]:
+        """
+        Yields key, rating and tags of every post. Dataframe posts are read column-wise,
+        without building Post objects for fields which captions never use.
+        """
+        if not isinstance(posts, E621PostsDF):
+            get_key = attrgetter(naming)
+            for post in posts:
+                yield f"{get_key(post)}", post.rating, post.tags
+            return
+        posts_df = posts._select_columns(naming, 'rating', 'tag_string').select(
+            pl.col(naming).cast(pl.Utf8),
+            pl.col('rating'),
+            pl.col('tag_string').str.extract_all(r'\S+').alias('tags'),
+        )
+        if isinstance(posts_df, pl.LazyFrame):
+            posts_df = posts_df.collect(engine='streaming')
+        keys = posts_df[naming].to_list()
+        ratings = map(Rating, posts_df['rating'].to_list())
+        posts_tags = posts_df['tags'].to_list()
+        for key, rating, tags in zip(keys, ratings, posts_tags):
+            yield key, rating, frozenset(map(sys.intern, tags))
+
+    @staticmethod
+    def _get_dataframe_captions(posts: E621PostsDF,
+                                tags: E621TagsDF,
+                                *,
+                                naming: Literal['id', 'md5'],
+                                remove_underscores: bool,
+                                remove_parentheses: bool,
+                                tags_separator: str,
+                                tags_ordering: Sequence[TagCategory],
+                                tags_to_head: Sequence[str],
+                                tags_to_tail: Sequence[str],
+                                add_rating_tags: Container[Rating],
+                                exclude_tags: Collection[str],
+                                ) -> dict[str, str]:
+        """
+        Builds the same captions as the per-post loop, but in a single Polars query.
+        """
+        categories_ranks = {category.value: rank for rank, category in enumerate(tags_ordering)}
+        skipped_tags = pl.Series(list({*tags_to_head, *tags_to_tail, *exclude_tags, ''}), dtype=pl.Utf8).implode()
+        rating_tags = {rating.value: rating.name.lower() for rating in Rating if rating in add_rating_tags}
+
+        posts_df = (
+            posts.dataframe.lazy()
+            .select(
+                pl.col(naming).cast(pl.Utf8).alias('key'),
+                pl.col('rating'),
+                pl.col('tag_string').str.split(' ').list.set_difference(skipped_tags).alias('tag'),
+            )
+            .with_row_index('position')
+        )
+        ordered_tags_df = (
+            posts_df
+            .select('position', 'tag')
+            .explode('tag')
+            .join(
+                tags.dataframe.lazy().select(pl.col('name').alias('tag'), 'category'),
+                on='tag', how='left'
+            )
+            .with_columns(
+                pl.col('category')
+                .replace_strict(categories_ranks, default=len(categories_ranks), return_dtype=pl.Int64)
+                .alias('rank')
+            )
+            .group_by('position')
+            .agg(pl.col('tag').sort_by('rank', 'tag').drop_nulls())
+        )
+
+        tag_expr = pl.element()
+        if remove_underscores:
+            tag_expr = tag_expr.str.replace_all('_', ' ', literal=True)
+        if remove_parentheses:
+            tag_expr = tag_expr.str.replace_all(r'[()]', '')
+        tags_expr = pl.col('tag').list.eval(tag_expr)
+        if rating_tags:
+            rating_tag = pl.col('rating').replace_strict(rating_tags, default=None, return_dtype=pl.Utf8)
+            tags_expr = pl.concat_list(tags_expr, rating_tag).list.drop_nulls()
+        caption_parts = [*map(pl.lit, tags_to_head), tags_expr, *map(pl.lit, tags_to_tail)]
+
+        captions_df = (
+            posts_df
+            .select('position', 'key', 'rating')
+            .join(ordered_tags_df, on='position', how='left')
+            .sort('position')
+            .select('key', pl.concat_list(caption_parts).list.join(tags_separator).alias('caption'))
+            .collect(engine='streaming')
+        )
+        captions = dict(zip(captions_df['key'].to_list(), captions_df['caption'].to_list()))
+        return captions
+
     @staticmethod
     def _format_tags(tags: Iterable[str],
                      remove_underscores: bool = False,
                      remove_parentheses: bool = False,
                      ) -> list[str]:
-        if remove_underscores:
-            tags = (tag.replace('_', ' ') for tag in tags)
-
-        if remove_parentheses:
-            tags = (tag.replace('(', '').replace(')', '') for tag in tags)
-
-        return list(tags)
+        if not (remove_underscores or remove_parentheses):
+            return list(tags)
+        translation = _TAGS_TRANSLATIONS[remove_underscores, remove_parentheses]
+        return [tag.translate(translation) for tag in tags]
 
 
 def autoinit_from_directory(data_export_directory: str | Path,
@@ -649,13 +832,13 @@ def autoinit_from_directory(data_export_directory: str | Path,
             continue
 
         try:
-            tags_df = _try_scan_files(tags_files_group.values())
+            tags_df = _try_scan_files(tags_files_group.values(), csv_dtypes=_TAGS_CSV_DTYPES)
             tags = E621TagsDF(tags_df)
         except ValueError:
             pass
 
         try:
-            posts_df = _try_scan_files(posts_files_group.values())
+            posts_df = _try_scan_files(posts_files_group.values(), csv_dtypes=_POSTS_CSV_DTYPES)
             posts = E621PostsDF(posts_df)
         except ValueError:
             pass
@@ -673,35 +856,36 @@ def _find_dump_files(data_export_directory: Path,
                      *,
                      specific_date: date | None = None
                      ) -> dict[date, dict[Literal['posts', 'tags'], dict[str, Path]]]:
-    numbers = "".join(map(str, range(10))).join("[]")
-    year = numbers * 4
-    month = numbers * 2
-    day = numbers * 2
-    date_tag = f"{year}-{month}-{day}"
-    date_pattern = re.compile(r".*(\d{4}\-\d{2}\-\d{2})\..*")
-    tags_files = data_export_directory.glob(f"tags-{date_tag}.*")
-    posts_files = data_export_directory.glob(f"posts-{date_tag}.*")
     data_files: dict[date, dict[Literal["posts", "tags"], dict[str, Path]]] = {}
-    for path in chain(tags_files, posts_files):
-        date_suffix = date_pattern.match(path.name)
-        if date_suffix is None:
-            raise RuntimeError("Unexpected condition: date_suffix is None")
-        file_date = date.fromisoformat(date_suffix.groups()[0])
+    for path in data_export_directory.iterdir():
+        kind, _, name_rest = path.name.partition("-")
+        if kind not in ("posts", "tags"):
+            continue
+        date_raw, dot, _ = name_rest.partition(".")
+        if not dot or len(date_raw) != 10 or not date_raw.replace("-", "").isdigit():
+            continue
+        try:
+            file_date = date.fromisoformat(date_raw)
+        except ValueError:
+            continue
         if specific_date and file_date != specific_date:
             continue
         files_for_date = data_files.setdefault(file_date, {})
-        file_kind: Literal["posts", "tags"] = "posts" if path.name.startswith("posts") else "tags"
+        file_kind: Literal["posts", "tags"] = "posts" if kind == "posts" else "tags"
         files_group = files_for_date.setdefault(file_kind, {})
         # NOTE: possible miss of duplicated files
         files_group[path.suffix] = path
     return data_files
 
 
-def _try_scan_files(paths: Iterable[Path]) -> pl.LazyFrame:
+def _try_scan_files(paths: Iterable[Path],
+                    *,
+                    csv_dtypes: _CSVDtypes | None = None
+                    ) -> pl.LazyFrame:
     df = None
     for path in paths:
         try:
-            df = scan_file(path)
+            df = scan_file(path, csv_dtypes=csv_dtypes)
         except Exception:
             continue
         break
@@ -710,8 +894,10 @@ def _try_scan_files(paths: Iterable[Path]) -> pl.LazyFrame:
     return df
 
 
-def scan_file(file_path: Path) -> pl.LazyFrame:
+def scan_file(file_path: Path, *, csv_dtypes: _CSVDtypes | None = None) -> pl.LazyFrame:
     match file_path.suffix:
+        case ".csv" if csv_dtypes is not None:
+            return pl.scan_csv(file_path, schema_overrides=csv_dtypes, infer_schema_length=0)
         case ".csv":
             return pl.scan_csv(file_path)
         case ".parquet":
@@ -720,6 +906,32 @@ def scan_file(file_path: Path) -> pl.LazyFrame:
             raise ValueError(f"Unsupported file extension '{other}' (file '{file_path}')")
 
 
+def _scan_csv_with_parquet_cache(csv_path: Path, *, csv_dtypes: _CSVDtypes) -> pl.LazyFrame:
+    """
+    Converts CSV to parquet stored next to it (only if there is no up-to-date one) and scans the parquet.
+    Unlike CSV, parquet row groups let Polars skip chunks by predicates and read only needed columns.
+    Cache file is hidden, so it doesn't look like a dump file to _find_dump_files.
+    """
+    cache_path = csv_path.with_name(f".{csv_path.stem}.cached.parquet")
+    if not _is_parquet_cache_valid(cache_path, csv_path, csv_dtypes=csv_dtypes):
+        log.info("Caching '%s' as '%s'", csv_path, cache_path)
+        partial_path = cache_path.with_suffix(".parquet.partial")
+        (
+            pl.scan_csv(csv_path, schema_overrides=csv_dtypes, infer_schema_length=0)
+            .sink_parquet(partial_path, compression="zstd", row_group_size=128 * 1024)
+        )
+        partial_path.replace(cache_path)
+    return pl.scan_parquet(cache_path)
+
+
+def _is_parquet_cache_valid(cache_path: Path, csv_path: Path, *, csv_dtypes: _CSVDtypes) -> bool:
+    if not cache_path.exists() or cache_path.stat().st_mtime < csv_path.stat().st_mtime:
+        return False
+    # caches written with other column types are rebuilt
+    cache_schema = pl.read_parquet_schema(cache_path)
+    return all(cache_schema.get(column) == dtype for column, dtype in csv_dtypes.items())
+
+
 def write_parquet(df: pl.DataFrame | pl.LazyFrame,
                   parquet_path: Path | str,
                   *,
@@ -730,12 +942,14 @@ def write_parquet(df: pl.DataFrame | pl.LazyFrame,
         raise FileExistsError(f"File '{parquet_path}' already exists")
 
     if isinstance(df, pl.LazyFrame):
-        df = df.collect()
-
-    df.write_parquet(parquet_path)
+        df.sink_parquet(parquet_path)
+    else:
+        df.write_parquet(parquet_path)
 
 
 def _combine_pl_filter_exprs(*exprs: pl.Expr, method: Literal['any', 'all'] = 'all') -> pl.Expr:
-    head, *_exprs = exprs
-    reducer = (ior if method == 'any' else iand)
-    return reduce(reducer, _exprs, head)
+    if not exprs:
+        raise ValueError("At least one filter expression required")
+    if len(exprs) == 1:
+        return exprs[0]
+    return pl.any_horizontal(*exprs) if method == 'any' else pl.all_horizontal(*exprs)
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, fields
 from datetime import datetime, timedelta
 from enum import Enum
-from functools import cached_property
-from typing import Any, Sequence
+from itertools import starmap
+from typing import Any, Callable, Iterator, Sequence
 
-from adaptix import Retort, P, loader, name_mapping
+import polars as pl
+from adaptix import Retort
 
 from glutamate.consts import E621_STATIC_URL
 
@@ -50,7 +52,7 @@ ANY_RATING = tuple(Rating)
 ANY_TAG_CATEGORY = tuple(TagCategory)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Post:
     id: int
     uploader_id: int
@@ -82,18 +84,18 @@ class Post:
     is_status_locked: bool
     is_note_locked: bool
 
-    @cached_property
+    @property
     def tags(self) -> frozenset[str]:
-        return frozenset(self.tag_string.split())
+        return frozenset(map(sys.intern, self.tag_string.split()))
 
-    @cached_property
+    @property
     def file_url(self) -> str:
         md5 = self.md5
         first_hex = md5[:2]
         second_hex = md5[2:4]
         return f"{E621_STATIC_URL}/{first_hex}/{second_hex}/{md5}.{self.raw_file_ext}"
 
-    @cached_property
+    @property
     def file_ext(self) -> EXT:
         return EXT(self.raw_file_ext.split('.')[-1])
 
@@ -134,30 +136,117 @@ def _parse_dt(data: str) -> datetime | None:
     '''
     if not data:
         return None
+    try:
+        # handles both variants when fractional part has 3 or 6 digits
+        return datetime.fromisoformat(data)
+    except ValueError:
+        pass
     try:
         return datetime.strptime(data, '%Y-%m-%d %H:%M:%S.%f')
     except ValueError:
         return datetime.strptime(data, '%Y-%m-%d %H:%M:%S')
 
 
-_retort = Retort(
-    recipe=[
-        loader(bool, lambda data: {'t': True, 'f': False}.get(data, False)),
-        loader(P[Post].created_at, _parse_dt),
-        loader(P[Post].updated_at, _parse_dt),
-        loader(P[Post].source, lambda data: tuple(data.split()) if data is not None else ()),
-        loader(P[Post].parent_id, lambda data: int(data) if data else None),
-        loader(P[Post].approver_id, lambda data: int(data) if data else None),
-        loader(P[Post].duration, lambda data: timedelta(seconds=float(data)) if data else None),
-        name_mapping(Post, map={'raw_file_ext': 'file_ext'}),
-    ],
-    strict_coercion=False
-)
+_retort = Retort(strict_coercion=False)
+
+
+def _load_bool(data: Any) -> bool:
+    return data is True or data == 't'
+
+
+def _load_str(data: Any) -> str:
+    return '' if data is None else str(data)
+
+
+def _load_optional_int(data: Any) -> int | None:
+    return int(data) if data else None
+
+
+def _load_source(data: Any) -> tuple[str, ...]:
+    return tuple(data.split()) if data is not None else ()
+
+
+def _load_duration(data: Any) -> timedelta | None:
+    return timedelta(seconds=float(data)) if data else None
+
+
+_POST_LOADERS: dict[str, Callable[[Any], Any]] = {
+    'created_at': _parse_dt, 'updated_at': _parse_dt,
+    'source': _load_source, 'rating': Rating,
+    'parent_id': _load_optional_int, 'approver_id': _load_optional_int,
+    'duration': _load_duration,
+}
 
 
 def load_post(data: dict[str, Any]) -> Post:
-    return _retort.load(data, Post)
+    return Post(*[load(data[column_name]) for column_name, load in _POST_FIELDS_LOADERS])
 
 
 def load_tag(data: dict[str, Any]) -> Tag:
     return _retort.load(data, Tag)
+
+
+_RATINGS = {rating.value: rating for rating in Rating}
+_POST_BOOL_FIELDS = frozenset({
+    'is_deleted', 'is_pending', 'is_flagged', 'is_rating_locked', 'is_status_locked', 'is_note_locked',
+})
+_POST_INT_FIELDS = frozenset({
+    'id', 'uploader_id', 'image_width', 'image_height', 'fav_count', 'change_seq', 'file_size',
+    'comment_count', 'score', 'up_score', 'down_score', 'parent_id', 'approver_id',
+})
+_POST_DATETIME_FIELDS = frozenset({'created_at', 'updated_at'})
+_POST_OPTIONAL_FIELDS = frozenset({'parent_id', 'approver_id', 'duration', 'updated_at'})
+
+
+def _post_field_loader(field_name: str) -> Callable[[Any], Any]:
+    if field_name in _POST_LOADERS:
+        return _POST_LOADERS[field_name]
+    if field_name in _POST_BOOL_FIELDS:
+        return _load_bool
+    if field_name in _POST_INT_FIELDS:
+        return int
+    return _load_str
+
+
+_POST_FIELDS_LOADERS = tuple(
+    ('file_ext' if field.name == 'raw_file_ext' else field.name, _post_field_loader(field.name))
+    for field in fields(Post)
+)
+
+
+def load_posts(posts_df: pl.DataFrame) -> Iterator[Post]:
+    """
+    Loads posts from dataframe column-wise: values are casted by Polars for whole columns at once.
+    """
+    casted_df = posts_df.select(_posts_columns_exprs(posts_df.schema))
+    columns = [casted_df.get_column(name).to_list() for name in casted_df.columns]
+    source_index = casted_df.columns.index('source')
+    rating_index = casted_df.columns.index('rating')
+    columns[source_index] = [tuple(source) if source else () for source in columns[source_index]]
+    columns[rating_index] = list(map(_RATINGS.__getitem__, columns[rating_index]))
+    return starmap(Post, zip(*columns))
+
+
+def _posts_columns_exprs(schema: pl.Schema) -> list[pl.Expr]:
+    exprs: list[pl.Expr] = []
+    for field in fields(Post):
+        column_name = 'file_ext' if field.name == 'raw_file_ext' else field.name
+        column = pl.col(column_name)
+        dtype = schema[column_name]
+        strict = field.name not in _POST_OPTIONAL_FIELDS
+        if field.name in _POST_BOOL_FIELDS:
+            expr = column if dtype == pl.Boolean else (column == 't').fill_null(False)
+        elif field.name in _POST_INT_FIELDS:
+            expr = column.cast(pl.Int64, strict=strict)
+        elif field.name in _POST_DATETIME_FIELDS:
+            # see _parse_dt: fractional part of seconds may be missing
+            expr = column.str.to_datetime('%Y-%m-%d %H:%M:%S%.f', strict=strict) if dtype == pl.Utf8 else column
+        elif field.name == 'duration':
+            seconds = column.cast(pl.Float64, strict=False)
+            expr = (seconds * 1_000_000).cast(pl.Int64).cast(pl.Duration('us'))
+        elif field.name == 'source':
+            expr = column.str.extract_all(r'\S+') if dtype == pl.Utf8 else column
+        else:
+            expr = column.cast(pl.Utf8).fill_null('')
+        exprs.append(expr.alias(field.name))
+    return exprs
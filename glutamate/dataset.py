@@ -1,35 +1,176 @@
 from __future__ import annotations
 
+import asyncio
+import os
+import tarfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from io import BytesIO
 from pathlib import Path
-from typing import Mapping
+from typing import Iterable, Literal, Mapping
 
+import aiofiles
 import polars as pl
 
+from glutamate.database import E621PostsDF
+
+
+_WRITE_CAPTIONS_CHUNK_SIZE = 256
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
 
 def write_stats(stats: Mapping[str, int], csv_path: Path | str, *, allow_overwrite: bool = True) -> None:
     path = Path(csv_path)
+    _check_overwrite(path, allow_overwrite=allow_overwrite)
+
+    stats_df = pl.LazyFrame(
+        {'tag': list(stats.keys()), 'count': list(stats.values())},
+        schema={'tag': pl.Utf8, 'count': pl.Int64},
+    )
+    _sink_stats(stats_df, path)
+
+
+def write_stats_from_posts(posts: E621PostsDF, csv_path: Path | str, *, allow_overwrite: bool = True) -> None:
+    """
+    Counts tags of posts and writes stats in a single streaming query,
+    without building intermediate mapping like get_tags_stats does.
+    """
+    path = Path(csv_path)
+    _check_overwrite(path, allow_overwrite=allow_overwrite)
+
+    stats_df = (
+        posts.dataframe.lazy()
+        .select(pl.col('tag_string').str.split(' ').explode().alias('tag'))
+        .group_by('tag').agg(pl.len().cast(pl.Int64).alias('count'))
+    )
+    _sink_stats(stats_df, path)
+
+
+def _check_overwrite(path: Path, *, allow_overwrite: bool) -> None:
     if not allow_overwrite and path.exists():
         raise FileExistsError(
             f"File {path} already exists. If you want to overwrite it please use allow_overwrite=True"
         )
 
-    tags, counts = zip(*stats.items())
-    stats_df = (
-        pl.DataFrame({'tag': tags, 'count': counts})
+
+def _sink_stats(stats_df: pl.LazyFrame, path: Path) -> None:
+    (
+        stats_df
         .sort(
             pl.col('count'), pl.col('tag'),
             descending=[True, False],
             nulls_last=True
         )
+        .sink_csv(path)
     )
 
-    stats_df.write_csv(path)
 
-
-def write_captions(captions: Mapping[str, str],
+def write_captions(captions: Mapping[str, str | bytes],
                    target_directory: Path,
+                   *,
+                   max_workers: int | None = None,
                    ) -> None:
-    for identifier, caption in captions.items():
-        caption_fle_path = target_directory / f"{identifier}.txt"
-        with open(caption_fle_path, "w") as caption_file:
-            caption_file.write(caption)
+    """
+    Writes every caption into <identifier>.txt file in target directory; str captions are encoded to UTF-8.
+    Files are written by thread pool (GIL is released while writing), use max_workers=1 to write sequentially.
+    """
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+    if max_workers < 1:
+        raise ValueError("Workers count must be positive")
+    target_directory_path = os.fspath(target_directory)
+    captions_items = list(captions.items())
+    if max_workers == 1 or len(captions_items) <= _WRITE_CAPTIONS_CHUNK_SIZE:
+        _write_captions_chunk(target_directory_path, captions_items)
+        return
+    chunks = (
+        captions_items[start:start + _WRITE_CAPTIONS_CHUNK_SIZE]
+        for start in range(0, len(captions_items), _WRITE_CAPTIONS_CHUNK_SIZE)
+    )
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for _ in executor.map(partial(_write_captions_chunk, target_directory_path), chunks):
+            pass
+
+
+def _write_captions_chunk(target_directory_path: str, captions_items: Iterable[tuple[str, str | bytes]]) -> None:
+    for identifier, caption in captions_items:
+        caption_fle_path = os.path.join(target_directory_path, f"{identifier}.txt")
+        _write_file(caption_fle_path, _encode_caption(caption))
+
+
+def write_captions_archive(captions: Mapping[str, str | bytes],
+                           archive_path: Path | str,
+                           *,
+                           format: Literal['tar', 'parquet'] = 'tar',
+                           ) -> None:
+    """
+    Writes all captions into one archive instead of a file per caption.
+    Tar contains the same <identifier>.txt files as write_captions produces,
+    parquet contains 'identifier' and 'caption' columns.
+    """
+    path = Path(archive_path)
+    if format == 'tar':
+        mtime = time.time()
+        with tarfile.open(path, "w") as archive:
+            for identifier, caption in captions.items():
+                caption_data = _encode_caption(caption)
+                caption_info = tarfile.TarInfo(f"{identifier}.txt")
+                caption_info.size = len(caption_data)
+                caption_info.mtime = mtime
+                archive.addfile(caption_info, BytesIO(caption_data))
+    elif format == 'parquet':
+        captions_df = pl.DataFrame(
+            {'identifier': list(captions.keys()), 'caption': list(map(_decode_caption, captions.values()))},
+            schema={'identifier': pl.Utf8, 'caption': pl.Utf8},
+        )
+        captions_df.write_parquet(path, compression="zstd")
+    else:
+        raise ValueError(f"Unknown captions archive format '{format}'")
+
+
+async def write_captions_async(captions: Mapping[str, str | bytes],
+                               target_directory: Path,
+                               *,
+                               concurrency: int = 256,
+                               ) -> None:
+    """
+    Same as write_captions, but files are written concurrently, so waiting for one file
+    doesn't block submitting the next ones. At most `concurrency` files are open at once.
+    """
+    if concurrency < 1:
+        raise ValueError("Concurrency must be positive")
+    captions_iter = iter(captions.items())
+    target_directory_path = os.fspath(target_directory)
+
+    async def worker() -> None:
+        for identifier, caption in captions_iter:
+            caption_file_path = os.path.join(target_directory_path, f"{identifier}.txt")
+            async with aiofiles.open(caption_file_path, "wb") as caption_file:
+                await caption_file.write(_encode_caption(caption))
+
+    workers_count = min(len(captions), concurrency)
+    await asyncio.gather(*(worker() for _ in range(workers_count)))
+
+
+def _encode_caption(caption: str | bytes) -> bytes:
+    return caption if isinstance(caption, bytes) else caption.encode("utf-8")
+
+
+def _decode_caption(caption: str | bytes) -> str:
+    return caption.decode("utf-8") if isinstance(caption, bytes) else caption
+
+
+def _write_file(path: str, data: bytes) -> None:
+    fd = os.open(path, _WRITE_FLAGS, 0o644)
+    try:
+        _write_all(fd, data)
+    finally:
+        os.close(fd)
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
@@ -1,15 +1,16 @@
 from __future__ import annotations
 
 import asyncio
+from contextlib import ExitStack
 from functools import partial
 import logging
 from dataclasses import dataclass
-from itertools import pairwise
 from logging import Logger
 from pathlib import Path
 from typing import Generic, Iterable, Literal, Sequence, TypeVar
 
 import aiofiles
+from aiohttp import TCPConnector
 from aiohttp.client import ClientSession
 from aiohttp_socks import ProxyConnector
 from tqdm import tqdm
@@ -22,6 +23,7 @@ logger = logging.getLogger(__name__)
 default_tracker = partial(tqdm, disable=True)
 
 _Meta = TypeVar("_Meta")
+_WRITE_BUFFER_SIZE = 1024 * 1024
 
 
 class DownloadTask(Generic[_Meta]):
@@ -76,60 +78,57 @@ class FilesDownloader:
         return results
 
     async def _process(self, tasks: Sequence[_Task]) -> list[FinishedDownload[_Task]]:
-        queue: asyncio.Queue[tuple[ClientSession, _Task]] = asyncio.Queue()
-        connector = ProxyConnector.from_url(self._proxy_url) if self._proxy_url else None
+        queue: asyncio.Queue[_Task | None] = asyncio.Queue()
         workers_count = min(len(tasks), self._workers_count)
+        connector: TCPConnector
+        if self._proxy_url:
+            connector = ProxyConnector.from_url(self._proxy_url, limit=workers_count)
+        else:
+            connector = TCPConnector(limit=workers_count)
         async with ClientSession(connector=connector) as client:
             for download_info in tasks:
-                queue.put_nowait((client, download_info))
-            with self._tracker(total=queue.qsize()) as total_progress:
-                events: list[asyncio.Event | None] = [asyncio.Event() for _ in range(workers_count-1)]
-                events = [None, *events, None]
-                event_pairs = list(pairwise(events))
+                queue.put_nowait(download_info)
+            for _ in range(workers_count):
+                queue.put_nowait(None)
+            with self._tracker(total=len(tasks)) as total_progress:
                 self._log.info("Start %s workers", workers_count)
-                workers = [
-                    self._wrapped_worker(queue, total_progress, n, events)
-                    for n, events in enumerate(event_pairs, start=1)
-                ]
-                finished, _ = await asyncio.wait(workers)
+                with ExitStack() as stack:
+                    progresses = [
+                        stack.enter_context(
+                            self._tracker(desc=f"Worker {n:02}", unit="B", unit_scale=True, position=n)
+                        )
+                        for n in range(1, workers_count + 1)
+                    ]
+                    workers = [
+                        self._wrapped_worker(client, queue, progress, total_progress, n)
+                        for n, progress in enumerate(progresses, start=1)
+                    ]
+                    workers_results = await asyncio.gather(*workers)
         total_results: list[FinishedDownload[_Task]] = []
-        for task in finished:
-            results = task.result()
+        for results in workers_results:
             total_results.extend(results)
         return total_results
 
     async def _wrapped_worker(self,
-                              queue: asyncio.Queue[tuple[ClientSession, _Task]],
+                              client: ClientSession,
+                              queue: asyncio.Queue[_Task | None],
+                              progress: Tracker,
                               total_progress: Tracker,
                               worker_position: int = 0,
-                              syncronisation_events: tuple[asyncio.Event | None, asyncio.Event | None] = (None, None),
                               ) -> list[FinishedDownload[_Task]]:
-        self._log.info("Start worker #%s", worker_position)
-        self_event, next_event = syncronisation_events
-        if self_event:
-            await self_event.wait()
-            self_event.clear()
-        desc = f"Worker {worker_position:02}"
-        with self._tracker(desc=desc, unit="B", unit_scale=True, position=worker_position) as progress:
-            if next_event:
-                next_event.set()
-            self._log.info("Worker %s ready, start downloading files", worker_position)
-            results = await self._worker(queue, progress, total_progress)
-            self._log.info("Worker %s done", worker_position)
-            if self_event:
-                await self_event.wait()
-            if next_event:
-                next_event.set()
+        self._log.info("Worker %s ready, start downloading files", worker_position)
+        results = await self._worker(client, queue, progress, total_progress)
+        self._log.info("Worker %s done", worker_position)
         return results
 
     async def _worker(self,
-                      queue: asyncio.Queue[tuple[ClientSession, _Task]],
+                      client: ClientSession,
+                      queue: asyncio.Queue[_Task | None],
                       progress: Tracker,
                       total_progress: Tracker,
                       ) -> list[FinishedDownload[_Task]]:
         results: list[FinishedDownload[_Task]] = []
-        while not queue.empty():
-            client, task = await queue.get()
+        while (task := await queue.get()) is not None:
             exception = None
             self._log.info("Downloading '%s' to '%s'", task.url, task.target_file)
             try:
@@ -141,7 +140,8 @@ class FilesDownloader:
                     task.url, task.target_file,
                     exc_info=exc
                 )
-            self._log.info("Successfully downloaded '%s' to '%s'", task.url, task.target_file)
+            else:
+                self._log.info("Successfully downloaded '%s' to '%s'", task.url, task.target_file)
             results.append(FinishedDownload(task, exception))
             if total_progress:
                 total_progress.update(1)
@@ -158,10 +158,18 @@ class FilesDownloader:
                     chunks = response.content.iter_chunked(self._chunk_size)
                 else:
                     chunks = response.content.iter_any()
+                buffer = bytearray()
                 async for chunk in chunks:
-                    downloaded += len(chunk)
-                    await file.write(chunk)
-                    progress.update(len(chunk))
+                    buffer += chunk
+                    if len(buffer) >= _WRITE_BUFFER_SIZE:
+                        await file.write(buffer)
+                        downloaded += len(buffer)
+                        progress.update(len(buffer))
+                        buffer.clear()
+                if buffer:
+                    await file.write(buffer)
+                    downloaded += len(buffer)
+                    progress.update(len(buffer))
         return downloaded
 
 
@@ -26,5 +26,20 @@ def scan_fluffyrock_dump(dump_path: str | Path, lazy: bool = True) -> E621PostsD
         .list.join(" ").alias('tag_string')
     )
     if not lazy:
-        compatible_df = compatible_df.collect()
+        compatible_df = compatible_df.collect(engine='streaming')
     return E621PostsDF(compatible_df)
+
+
+def materialize_fluffyrock_dump(dump_path: str | Path,
+                                target_path: str | Path,
+                                *,
+                                allow_overwrite: bool = False
+                                ) -> E621PostsDF[pl.LazyFrame]:
+    """
+    Writes fluffyrock dump converted to e621 format into parquet, so conversion is paid only once.
+    """
+    target_path = Path(target_path)
+    if target_path.exists() and not allow_overwrite:
+        raise FileExistsError(f"File '{target_path}' already exists")
+    scan_fluffyrock_dump(dump_path).dataframe.sink_parquet(target_path, compression="zstd")
+    return E621PostsDF(pl.scan_parquet(target_path))